@@ -1,24 +1,67 @@
 import argparse
+import hashlib
+import json
+import multiprocessing
 import os
 import shutil
+import subprocess
+import sys
+import tempfile
+import threading
 import requests
-from urllib.parse import urlparse
-from git import Repo, GitCommandError
-from rich.progress import Progress
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import ExitStack, nullcontext
+from functools import lru_cache
+from itertools import islice
+from queue import Queue
+from urllib.parse import parse_qs, urlparse
+from rich.progress import BarColumn, Progress, TextColumn, TimeElapsedColumn
 from rich.console import Console
-from rich.table import Table
+from rich.markup import escape
 
 console = Console()
+show_progress = True
+json_file = sys.stdout
+cleanup_threads = []
+PROGRESS_BATCH = 128
+UMASK = os.umask(0)
+os.umask(UMASK)
 
 def extract_repo_name(repo_input):
     if repo_input.endswith('.git'):
         return os.path.splitext(os.path.basename(urlparse(repo_input).path))[0]
     return os.path.basename(os.path.abspath(repo_input))
 
-def clone_repo(repo_url, dest_dir):
+def clone_repo(repo_url, dest_dir, full_clone=False):
     if os.path.exists(dest_dir):
         shutil.rmtree(dest_dir)
-    return Repo.clone_from(repo_url, dest_dir)
+    if full_clone:
+        subprocess.check_call(["git", "clone", "--quiet", repo_url, dest_dir])
+    else:
+        subprocess.check_call(["git", "clone", "--quiet", "--bare", "--filter=blob:none", "--no-tags", repo_url, dest_dir])
+
+def cached_clone_dir(repo_url, full_clone=False):
+    cache_root = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "git-restore")
+    key = hashlib.sha1(repo_url.encode()).hexdigest()
+    return os.path.join(cache_root, f"{key}-full" if full_clone else key)
+
+def read_clone_stamp(repo_dir):
+    try:
+        with open(os.path.join(repo_dir, ".gitrestore.stamp"), "r") as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        return None
+
+def write_clone_stamp(repo_dir, repo_url):
+    with open(os.path.join(repo_dir, ".gitrestore.stamp"), "w") as f:
+        f.write(f"{repo_url}\n")
+
+def fetch_repo(repo_dir, full_clone=False):
+    if full_clone:
+        subprocess.check_call(["git", "-C", repo_dir, "fetch", "--quiet", "--all", "--prune"])
+    else:
+        subprocess.check_call(["git", "-C", repo_dir, "fetch", "--quiet", "--prune", "--no-tags", "origin",
+                               "+refs/heads/*:refs/heads/*"])
 
 def format_size(bytes_size):
     if bytes_size >= 1024 ** 3:
@@ -30,112 +73,475 @@ def format_size(bytes_size):
     else:
         return f"{bytes_size} B"
 
+@lru_cache(maxsize=1)
 def get_excluded_extensions():
     try:
         with open("excluded_file_extensions.txt", "r") as f:
-            return set(line.strip().lower() for line in f if line.strip())
+            return frozenset(line.strip().lower() for line in f if line.strip())
     except FileNotFoundError:
-        return set()
-
-def list_deleted_files_visual(repo_dir, min_size=None, max_size=None, exclude_ext=False, scan_percent=None):
-    excluded_exts = get_excluded_extensions() if exclude_ext else set()
-    repo = Repo(repo_dir)
-    commits = list(repo.iter_commits('--all'))
-    if scan_percent:
-        commits = sorted(commits, key=lambda c: c.committed_datetime)
-        cutoff = max(1, int(len(commits) * (scan_percent / 100)))
-        commits = commits[:cutoff]
-
-    table = Table(title="Deleted Files", show_lines=True)
-    table.add_column("Commit", style="bold cyan", width=10)
-    table.add_column("File Path", style="yellow")
-    table.add_column("Size", justify="right")
-
-    with Progress() as progress:
-        task = progress.add_task("[cyan]Scanning commits...", total=len(commits))
-
-        for commit in commits:
-            progress.update(task, advance=1)
-            parents = commit.parents
-            if not parents:
-                continue
-            parent = parents[0]
+        return frozenset()
+
+def _file_ext(path):
+    name = path.rpartition('/')[2]
+    dot = name.rfind('.')
+    return name[dot:].lower() if dot > 0 else ''
+
+def make_path_filter(exclude_ext):
+    if not exclude_ext:
+        return None
+    is_excluded = get_excluded_extensions().__contains__
+    return lambda path: not is_excluded(_file_ext(path))
+
+def make_size_filter(min_size, max_size):
+    if min_size and max_size:
+        return lambda size: min_size <= size <= max_size
+    if min_size:
+        return lambda size: size >= min_size
+    if max_size:
+        return lambda size: size <= max_size
+    return None
+
+class BatchCatFile:
+    def __init__(self, repo_dir, check=False):
+        self.cmd = ["git", "-C", repo_dir, "cat-file", "--batch-check" if check else "--batch"]
+        self.proc = None
+        self.sizes = {}
+
+    def __enter__(self):
+        self.proc = subprocess.Popen(self.cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+        return self
+
+    def __exit__(self, *exc):
+        self.proc.stdin.close()
+        self.proc.stdout.close()
+        self.proc.wait()
+
+    def request(self, sha):
+        self.proc.stdin.write(f"{sha}\n".encode())
+        self.proc.stdin.flush()
+        header = self.proc.stdout.readline().split()
+        if len(header) != 3:
+            raise LookupError(f"object {sha} missing")
+        return header[1].decode(), int(header[2])
+
+    def size(self, sha):
+        oid = bytes.fromhex(sha)
+        size = self.sizes.get(oid)
+        if size is None:
+            size = self.sizes[oid] = self.request(sha)[1]
+        return size
+
+    def skip(self, size):
+        while size >= 0:
+            chunk = self.proc.stdout.read(min(size + 1, 1 << 20))
+            if not chunk:
+                break
+            size -= len(chunk)
+
+    def copy_to(self, f, size):
+        stdout = self.proc.stdout
+        remaining = size
+        try:
+            if remaining:
+                head = stdout.read1(remaining)
+                remaining -= len(head)
+                f.write(head)
+            if remaining and hasattr(os, "splice"):
+                f.flush()
+                while remaining:
+                    n = os.splice(stdout.fileno(), f.fileno(), remaining)
+                    if not n:
+                        break
+                    remaining -= n
+            while remaining:
+                chunk = stdout.read(min(remaining, 1 << 20))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                f.write(chunk)
+        finally:
+            self.skip(remaining)
+        if remaining:
+            raise EOFError(f"cat-file output ended {remaining} bytes short")
+
+def _scan_cutoff(repo_dir, scan_percent):
+    total = int(subprocess.check_output(["git", "-C", repo_dir, "rev-list", "--all", "--count"]))
+    if not total:
+        return None
+    keep = max(1, int(total * (scan_percent / 100)))
+    cutoff = subprocess.check_output(["git", "-C", repo_dir, "log", "--all", "--date-order", f"--skip={total - keep}",
+                                      "--max-count=1", "--pretty=%ct"], text=True)
+    return int(cutoff)
+
+def _iter_deleted(repo_dir, scan_percent=None):
+    cmd = ["git", "-C", repo_dir, "log", "--diff-filter=D", "--raw", "-z", "--no-abbrev", "--no-renames",
+           "--diff-algorithm=histogram", "--diff-merges=first-parent", "--pretty=format:commit %H %ct", "--all"]
+    cutoff = _scan_cutoff(repo_dir, scan_percent) if scan_percent and scan_percent < 100 else None
+    if cutoff is not None:
+        cmd.append(f"--until=@{cutoff}")
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, bufsize=1 << 20)
+
+    commit_sha = committed_ts = blob_sha = None
+    pending = b""
+    try:
+        while True:
+            chunk = proc.stdout.read(1 << 16)
+            if not chunk:
+                break
+            tokens = (pending + chunk).split(b"\0")
+            pending = tokens.pop()
+            for token in tokens:
+                if blob_sha is not None:
+                    yield commit_sha, committed_ts, blob_sha, os.fsdecode(token)
+                    blob_sha = None
+                    continue
+                if token.startswith(b"commit "):
+                    header, _, token = token.partition(b"\n")
+                    _, commit_sha, committed_ts = header.decode().split()
+                    committed_ts = int(committed_ts)
+                if token.startswith(b":"):
+                    # :<old mode> <new mode> <old sha> <new sha> D
+                    blob_sha = token.split()[2].decode()
+    finally:
+        proc.stdout.close()
+        if proc.wait() not in (0, -13):
+            raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+def _iter_candidates(repo_dir, scan_percent, keep_path):
+    deleted = _iter_deleted(repo_dir, scan_percent)
+    if keep_path is None:
+        return deleted
+    return (entry for entry in deleted if keep_path(entry[3]))
+
+def _is_partial_clone(repo_dir):
+    result = subprocess.run(["git", "-C", repo_dir, "config", "--get", "remote.origin.promisor"],
+                            capture_output=True, text=True)
+    return result.stdout.strip() == "true"
+
+def _prefetch_blobs(repo_dir, deleted, chunk_size=1000):
+    if not _is_partial_clone(repo_dir):
+        yield from deleted
+        return
+    cmd = ["git", "-C", repo_dir, "-c", "fetch.negotiationAlgorithm=noop", "fetch", "--quiet", "--no-tags",
+           "--no-write-fetch-head", "--recurse-submodules=no", "--filter=blob:none", "--stdin", "origin"]
+    deleted = iter(deleted)
+    while True:
+        chunk = list(islice(deleted, chunk_size))
+        if not chunk:
+            return
+        subprocess.run(cmd, input="".join({f"{sha}\n": None for _, _, sha, _ in chunk}), text=True)
+        yield from chunk
+
+def _progress():
+    return Progress(TextColumn("[progress.description]{task.description}"), BarColumn(),
+                    TextColumn("{task.completed} files"), TimeElapsedColumn(),
+                    console=console, disable=not show_progress)
+
+def list_deleted_files_visual(repo_dir, min_size=None, max_size=None, exclude_ext=False, scan_percent=None, json_output=False,
+                              repo=None):
+    repo_label = f"[magenta]{escape(extract_repo_name(repo))}[/] " if repo else ""
+    keep_path = make_path_filter(exclude_ext)
+    keep_size = make_size_filter(min_size, max_size)
+
+    with _progress() as progress, BatchCatFile(repo_dir, check=True) as cat:
+        task = progress.add_task("[cyan]Scanning deleted files...", total=None)
+        scanned = 0
+
+        for commit_sha, _, blob_sha, path in _prefetch_blobs(repo_dir, _iter_candidates(repo_dir, scan_percent, keep_path)):
+            scanned += 1
+            if scanned >= PROGRESS_BATCH:
+                progress.update(task, advance=scanned)
+                scanned = 0
             try:
-                diff = parent.diff(commit, paths=None, create_patch=False)
-                for d in diff:
-                    if d.change_type == 'D':
-                        path = d.a_path
-                        if exclude_ext and os.path.splitext(path)[1].lower() in excluded_exts:
-                            continue
+                size_bytes = cat.size(blob_sha)
+                if keep_size and not keep_size(size_bytes):
+                    continue
+            except Exception:
+                size_bytes = None
+            if json_output:
+                row = {"repo": repo or repo_dir, "commit": commit_sha, "path": path, "size": size_bytes}
+                json_file.write(json.dumps(row) + "\n")
+                json_file.flush()
+            else:
+                size_str = "?" if size_bytes is None else format_size(size_bytes)
+                console.print(f"{repo_label}[bold cyan]{commit_sha[:7]}[/] [yellow]{escape(path)}[/] {size_str}", highlight=False)
+        progress.update(task, advance=scanned)
+
+def _run_stage(errors, target, *args):
+    def run():
+        try:
+            target(*args)
+        except BaseException as e:
+            errors.append(e)
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+def _queue_deleted(repo_dir, output_dir, keep_path, keep_size, scan_percent, q_paths, q_done, workers):
+    dispatched = set()
+    unwritable = set()
+    made_dirs = set()
+
+    def make_shard(shard):
+        if shard not in made_dirs:
+            os.makedirs(shard, exist_ok=True)
+            made_dirs.add(shard)
+
+    try:
+        with BatchCatFile(repo_dir, check=True) if keep_size else nullcontext() as check:
+            for commit_sha, _, blob_sha, file_path in _prefetch_blobs(repo_dir, _iter_candidates(repo_dir, scan_percent, keep_path)):
+                shard = os.path.join(output_dir, commit_sha[:2])
+                safe_name = file_path.replace('/', '_')
+                full_path = os.path.join(shard, f"{commit_sha[2:]}___{safe_name}")
+                if blob_sha in dispatched:
+                    if blob_sha not in unwritable:
                         try:
-                            blob = parent.tree / path
-                            size_bytes = blob.size
-                            if (min_size and size_bytes < min_size) or (max_size and size_bytes > max_size):
-                                continue
-                            size_str = format_size(size_bytes)
-                        except Exception:
-                            size_str = "?"
-                        table.add_row(commit.hexsha[:7], path, size_str)
-            except GitCommandError:
-                continue
+                            make_shard(shard)
+                        except OSError as e:
+                            q_done.put(("skipped", file_path, full_path, blob_sha, e))
+                            continue
+                    q_done.put(("duplicate", file_path, full_path, blob_sha, None))
+                    continue
+                dispatched.add(blob_sha)
+                if check is not None:
+                    try:
+                        size_bytes = check.size(blob_sha)
+                    except Exception as e:
+                        unwritable.add(blob_sha)
+                        q_done.put(("failed", file_path, full_path, blob_sha, e))
+                        continue
+                    if not keep_size(size_bytes):
+                        unwritable.add(blob_sha)
+                        q_done.put(("filtered", file_path, full_path, blob_sha, None))
+                        continue
+                try:
+                    make_shard(shard)
+                except OSError as e:
+                    q_done.put(("path_failed", file_path, full_path, blob_sha, e))
+                    continue
+                q_paths.put((file_path, full_path, blob_sha))
+    finally:
+        for _ in range(workers):
+            q_paths.put(None)
+        q_done.put(None)
 
-    console.print(table)
+def _write_blob(cat, full_path, blob_sha):
+    _, size_bytes = cat.request(blob_sha)
+    try:
+        fd, tmp_path = _make_temp(full_path)
+    except OSError:
+        cat.skip(size_bytes)
+        raise
+    try:
+        with open(fd, 'wb') as f:
+            # mkstemp creates files 0600; give them the mode a plain open() would.
+            os.fchmod(fd, 0o666 & ~UMASK)
+            cat.copy_to(f, size_bytes)
+        os.replace(tmp_path, full_path)
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
 
-def restore_deleted_files_visual(repo_dir, output_dir, min_size=None, max_size=None, exclude_ext=False, scan_percent=None):
-    excluded_exts = get_excluded_extensions() if exclude_ext else set()
+def _try_write(cat, full_path, blob_sha):
+    # An OSError is about this destination path; anything else is about the blob itself.
+    try:
+        _write_blob(cat, full_path, blob_sha)
+    except OSError as e:
+        return "path_failed", e
+    except Exception as e:
+        return "failed", e
+    return "written", None
+
+def _write_blobs(repo_dir, q_paths, q_done):
+    try:
+        with BatchCatFile(repo_dir) as cat:
+            while (item := q_paths.get()) is not None:
+                file_path, full_path, blob_sha = item
+                kind, error = _try_write(cat, full_path, blob_sha)
+                q_done.put((kind, file_path, full_path, blob_sha, error))
+    finally:
+        q_done.put(None)
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _make_temp(path):
+    # Different deleted paths can flatten to the same name, so temp files must be unique per write.
+    return tempfile.mkstemp(dir=os.path.dirname(path), prefix=".", suffix=".part")
+
+def _link_or_copy(src, dst):
+    fd, tmp_path = _make_temp(dst)
+    os.close(fd)
+    try:
+        os.remove(tmp_path)
+        try:
+            os.link(src, tmp_path)
+        except OSError:
+            shutil.copy(src, tmp_path)
+        os.replace(tmp_path, dst)
+    except BaseException:
+        _remove_quietly(tmp_path)
+        raise
+
+def restore_deleted_files_visual(repo_dir, output_dir, min_size=None, max_size=None, exclude_ext=False, scan_percent=None, workers=2):
     os.makedirs(output_dir, exist_ok=True)
-    repo = Repo(repo_dir)
-    commits = list(repo.iter_commits('--all'))
-    if scan_percent:
-        commits = sorted(commits, key=lambda c: c.committed_datetime)
-        cutoff = max(1, int(len(commits) * (scan_percent / 100)))
-        commits = commits[:cutoff]
-
-    with Progress() as progress:
-        task = progress.add_task("[cyan]Restoring files...", total=len(commits))
-
-        for commit in commits:
-            progress.update(task, advance=1)
-            parents = commit.parents
-            if not parents:
-                continue
-            parent = parents[0]
-            try:
-                diff = parent.diff(commit, paths=None, create_patch=False)
-                for d in diff:
-                    if d.change_type == 'D':
-                        file_path = d.a_path
-                        if exclude_ext and os.path.splitext(file_path)[1].lower() in excluded_exts:
-                            continue
-                        safe_name = file_path.replace('/', '_')
-                        full_path = os.path.join(output_dir, f"{commit.hexsha}___{safe_name}")
-                        try:
-                            blob = parent.tree / file_path
-                            size_bytes = blob.size
-                            if (min_size and size_bytes < min_size) or (max_size and size_bytes > max_size):
-                                continue
-                            with open(full_path, 'wb') as f:
-                                f.write(blob.data_stream.read())
-                            console.print(f"[green][+][/green] {file_path} -> {full_path}")
-                        except Exception as e:
-                            console.print(f"[red][!][/red] Skipped {file_path}: {e}")
-            except GitCommandError:
+    q_paths = Queue(1024)
+    q_done = Queue(64)
+    errors = []
+    threads = [_run_stage(errors, _queue_deleted, repo_dir, output_dir, make_path_filter(exclude_ext),
+                          make_size_filter(min_size, max_size), scan_percent, q_paths, q_done, workers)]
+    threads += [_run_stage(errors, _write_blobs, repo_dir, q_paths, q_done) for _ in range(workers)]
+
+    written = {}
+    failed = {}
+    path_failed = set()
+    waiting = {}
+    stack = ExitStack()
+    retry_cat = None
+
+    def report(kind, file_path, full_path, blob_sha, error):
+        nonlocal retry_cat
+        if kind == "skipped":
+            console.print(f"[red][!][/red] Skipped {escape(file_path)}: {escape(str(error))}")
+            return
+        if kind == "duplicate":
+            if blob_sha in written:
+                try:
+                    _link_or_copy(written[blob_sha], full_path)
+                except OSError as e:
+                    kind, error = "path_failed", e
+                else:
+                    kind = "written"
+            elif blob_sha in failed:
+                kind, error = failed[blob_sha]
+            elif blob_sha in path_failed:
+                # No copy exists yet, so this deletion gets its own fresh write.
+                if retry_cat is None:
+                    retry_cat = stack.enter_context(BatchCatFile(repo_dir))
+                kind, error = _try_write(retry_cat, full_path, blob_sha)
+                if kind == "written":
+                    written[blob_sha] = full_path
+                elif kind == "failed":
+                    failed[blob_sha] = (kind, error)
+            else:
+                waiting.setdefault(blob_sha, []).append((file_path, full_path))
+                return
+        elif kind == "written":
+            written[blob_sha] = full_path
+        elif kind == "path_failed":
+            path_failed.add(blob_sha)
+        else:
+            failed[blob_sha] = (kind, error)
+
+        if kind == "written":
+            console.print(f"[green][+][/green] {escape(file_path)} -> {escape(full_path)}")
+        elif kind in ("failed", "path_failed"):
+            console.print(f"[red][!][/red] Skipped {escape(file_path)}: {escape(str(error))}")
+        for dup_path, dup_full_path in waiting.pop(blob_sha, ()):
+            report("duplicate", dup_path, dup_full_path, blob_sha, None)
+
+    with _progress() as progress, stack:
+        task = progress.add_task("[cyan]Restoring deleted files...", total=None)
+        running = len(threads)
+        handled = 0
+        while running:
+            item = q_done.get()
+            if item is None:
+                running -= 1
                 continue
+            handled += 1
+            if handled >= PROGRESS_BATCH:
+                progress.update(task, advance=handled)
+                handled = 0
+            report(*item)
+        progress.update(task, advance=handled)
+
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+def _fetch_repo_page(url, headers, page):
+    resp = requests.get(url, headers=headers, params={"per_page": 100, "page": page}, timeout=10)
+    resp.raise_for_status()
+    return resp
 
 def get_repos_from_github_user(username, gh_token=None):
     headers = {}
     if gh_token:
         headers['Authorization'] = f'token {gh_token}'
     url = f"https://api.github.com/users/{username}/repos"
-    print(headers)
     try:
-        resp = requests.get(url, headers=headers, timeout=10)
-        resp.raise_for_status()
-        return [repo['clone_url'] for repo in resp.json() if not repo.get('fork')]
+        first = _fetch_repo_page(url, headers, 1)
+        pages = [first]
+        last_url = first.links.get("last", {}).get("url")
+        if last_url:
+            last_page = int(parse_qs(urlparse(last_url).query)["page"][0])
+            with ThreadPoolExecutor(max_workers=min(8, last_page - 1)) as ex:
+                pages += ex.map(lambda page: _fetch_repo_page(url, headers, page), range(2, last_page + 1))
+        return [repo['clone_url'] for resp in pages for repo in resp.json() if not repo.get('fork')]
     except Exception as e:
         console.print(f"[red][!][/red] Failed to fetch repos for user {username}: {e}")
         return []
 
+def remove_in_background(path):
+    thread = threading.Thread(target=shutil.rmtree, args=(path,), kwargs={'ignore_errors': True})
+    thread.start()
+    cleanup_threads.append(thread)
+
+class _QueueWriter:
+    def __init__(self, queue, stream):
+        self.queue = queue
+        self.stream = stream
+
+    def write(self, text):
+        self.queue.put((self.stream, text))
+        return len(text)
+
+    def flush(self):
+        pass
+
+def _print_worker_output(queue):
+    for stream, text in iter(queue.get, None):
+        out = sys.stderr if stream == "stderr" else sys.stdout
+        out.write(text)
+        out.flush()
+
+def _init_worker(output_queue, json_output, color_system, width):
+    global console, json_file, show_progress
+    show_progress = False
+    json_file = _QueueWriter(output_queue, "stdout")
+    console = Console(file=_QueueWriter(output_queue, "stderr" if json_output else "stdout"),
+                      force_terminal=color_system is not None, color_system=color_system, width=width)
+
+def process_repo(repo_url, list_only, minsize, maxsize, exclude_ext, scan_pct, output_dir_base, full_clone=False, json_output=False,
+                 no_cache=False):
+    repo_name = extract_repo_name(repo_url)
+    repo_path = repo_name if no_cache else cached_clone_dir(repo_url, full_clone)
+    if not no_cache and read_clone_stamp(repo_path) == repo_url:
+        console.print(f"[bold green][i][/bold green] Updating cached clone of [yellow]{repo_url}[/yellow] in [blue]{repo_path}[/blue]...")
+        fetch_repo(repo_path, full_clone)
+    else:
+        console.print(f"[bold green][i][/bold green] Cloning [yellow]{repo_url}[/yellow] into [blue]{repo_path}[/blue]...")
+        clone_repo(repo_url, repo_path, full_clone)
+        if not no_cache:
+            write_clone_stamp(repo_path, repo_url)
+
+    if list_only:
+        console.print(f"[bold green][i][/bold green] Listing deleted files with size info...")
+        list_deleted_files_visual(repo_path, minsize, maxsize, exclude_ext, scan_pct, json_output, repo=repo_url)
+    else:
+        output_dir = output_dir_base or os.path.join("restored_repos", f"{repo_name}_restored")
+        console.print(f"[bold green][i][/bold green] Restoring to [blue]{output_dir}[/blue]...")
+        restore_deleted_files_visual(repo_path, output_dir, minsize, maxsize, exclude_ext, scan_pct)
+
+    if no_cache:
+        remove_in_background(repo_path)
+        console.print(f"[bold green][i][/bold green] Removing cloned repo [blue]{repo_path}[/blue] in the background")
+
 def main():
     parser = argparse.ArgumentParser(description='List or restore deleted files from a Git repo with rich output.')
     group = parser.add_mutually_exclusive_group(required=True)
@@ -145,12 +551,19 @@ def main():
     parser.add_argument('--github-token', help='Github Token for higher rate limits')
     parser.add_argument('--output-dir', help='Directory to save restored files')
     parser.add_argument('--list-only', action='store_true', help='Only list deleted files, do not restore')
+    parser.add_argument('--json', action='store_true', help='With --list-only, print one JSON object per deleted file')
     parser.add_argument('--minsize', type=int, help='Minimum file size in bytes')
     parser.add_argument('--maxsize', type=int, help='Maximum file size in bytes')
     parser.add_argument('--exclude-extensions', action='store_true', help='Exclude extensions listed in excluded_file_extensions.txt')
     parser.add_argument('--scan-oldest-commits', type=int, choices=range(1, 101), metavar='[1-100]', help='Only scan oldest X%% of commits')
+    parser.add_argument('--full-clone', action='store_true', help='Do a full clone instead of a bare, blobless one')
+    parser.add_argument('--no-cache', action='store_true', help='Clone into the working directory and remove it afterwards instead of reusing a cached clone')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count(), help='Number of repos to process in parallel')
 
     args = parser.parse_args()
+    if args.json:
+        global console
+        console = Console(stderr=True)
 
     repo_urls = []
     if args.github_username:
@@ -159,22 +572,33 @@ def main():
         repo_urls = [args.repo_url]
 
     if repo_urls:
-        for repo_url in repo_urls:
-            repo_name = extract_repo_name(repo_url)
-            repo_path = repo_name
-            console.print(f"[bold green][i][/bold green] Cloning [yellow]{repo_url}[/yellow] into [blue]{repo_path}[/blue]...")
-            clone_repo(repo_url, repo_path)
-
-            if args.list_only:
-                console.print(f"[bold green][i][/bold green] Listing deleted files with size info...")
-                list_deleted_files_visual(repo_path, args.minsize, args.maxsize, args.exclude_extensions, args.scan_oldest_commits)
-            else:
-                output_dir = args.output_dir or os.path.join("restored_repos", f"{repo_name}_restored")
-                console.print(f"[bold green][i][/bold green] Restoring to [blue]{output_dir}[/blue]...")
-                restore_deleted_files_visual(repo_path, output_dir, args.minsize, args.maxsize, args.exclude_extensions, args.scan_oldest_commits)
-
-            shutil.rmtree(repo_path, ignore_errors=True)
-            console.print(f"[bold green][i][/bold green] Removed cloned repo [blue]{repo_path}[/blue]")
+        repo_args = (args.list_only, args.minsize, args.maxsize, args.exclude_extensions, args.scan_oldest_commits,
+                     args.output_dir, args.full_clone, args.json, args.no_cache)
+        workers = max(1, min(args.jobs, len(repo_urls)))
+        if workers == 1:
+            for repo_url in repo_urls:
+                try:
+                    process_repo(repo_url, *repo_args)
+                except Exception as e:
+                    console.print(f"[red][!][/red] Failed to process {repo_url}: {e}")
+        else:
+            # The printer thread is already running, so forking would copy its locks mid-use.
+            mp_context = multiprocessing.get_context("spawn")
+            output_queue = mp_context.Queue()
+            printer = threading.Thread(target=_print_worker_output, args=(output_queue,))
+            printer.start()
+            try:
+                with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context, initializer=_init_worker,
+                                         initargs=(output_queue, args.json, console.color_system, console.width)) as ex:
+                    futures = {ex.submit(process_repo, repo_url, *repo_args): repo_url for repo_url in repo_urls}
+                    for future in as_completed(futures):
+                        try:
+                            future.result()
+                        except Exception as e:
+                            console.print(f"[red][!][/red] Failed to process {futures[future]}: {e}")
+            finally:
+                output_queue.put(None)
+                printer.join()
     else:
         repo_path = args.repo_path
         repo_name = extract_repo_name(repo_path)
@@ -182,12 +606,14 @@ def main():
 
         if args.list_only:
             console.print(f"[bold green][i][/bold green] Listing deleted files with size info...")
-            list_deleted_files_visual(repo_path, args.minsize, args.maxsize, args.exclude_extensions, args.scan_oldest_commits)
+            list_deleted_files_visual(repo_path, args.minsize, args.maxsize, args.exclude_extensions, args.scan_oldest_commits, args.json)
         else:
             output_dir = args.output_dir or os.path.join("restored_repos", f"{repo_name}_restored")
             console.print(f"[bold green][i][/bold green] Restoring to [blue]{output_dir}[/blue]...")
             restore_deleted_files_visual(repo_path, output_dir, args.minsize, args.maxsize, args.exclude_extensions, args.scan_oldest_commits)
 
+    for thread in cleanup_threads:
+        thread.join()
     console.print("[bold green][✓] Done.[/bold green]")
 
 if __name__ == '__main__':